@@ -29,6 +29,30 @@ class MemoryDb(ABC):
     def delete_memory(self, memory_id: str) -> None:
         raise NotImplementedError
 
+    def upsert_memories(self, memories: List[MemoryRow]) -> None:
+        """Upsert multiple memories. Override to use a bulk statement.
+        A failing row doesn't stop the others, the errors are raised together at the end."""
+        errors: List[str] = []
+        for memory in memories:
+            try:
+                self.upsert_memory(memory)
+            except Exception as e:
+                errors.append(f"{memory.id}: {e}")
+        if errors:
+            raise RuntimeError(f"Failed to upsert {len(errors)} of {len(memories)} memories ({'; '.join(errors)})")
+
+    def delete_memories(self, memory_ids: List[str]) -> None:
+        """Delete multiple memories. Override to use a bulk statement.
+        A failing row doesn't stop the others, the errors are raised together at the end."""
+        errors: List[str] = []
+        for memory_id in memory_ids:
+            try:
+                self.delete_memory(memory_id)
+            except Exception as e:
+                errors.append(f"{memory_id}: {e}")
+        if errors:
+            raise RuntimeError(f"Failed to delete {len(errors)} of {len(memory_ids)} memories ({'; '.join(errors)})")
+
     @abstractmethod
     def drop_table(self) -> None:
         raise NotImplementedError
@@ -20,7 +20,7 @@ class MemoryRow(BaseModel):
         if self.id is None:
             from uuid import uuid4
 
-            self.id = str(uuid4())
+            self.id = uuid4().hex
         return self
 
     def to_dict(self) -> Dict[str, Any]:
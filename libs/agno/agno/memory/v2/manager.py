@@ -1,35 +1,180 @@
-from copy import deepcopy
-from dataclasses import dataclass
+import json
+from datetime import datetime
+from os import getenv
 from textwrap import dedent
-from typing import Any, Callable, Dict, List, Optional
+from types import CodeType
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union
 
 from agno.memory.v2.db.base import MemoryDb
 from agno.memory.v2.db.schema import MemoryRow
-from agno.memory.v2.schema import UserMemory
 from agno.models.base import Model
 from agno.models.message import Message
 from agno.tools.function import Function
 from agno.utils.log import log_debug, log_error, log_warning, log_info
 
+# The memory tools are closures that are recreated for every run, but their signatures never change.
+# Parsed functions and their tool definitions are cached by the code object of the closure.
+_TOOL_SCHEMA_CACHE: Dict[CodeType, Tuple[Function, Dict[str, Any]]] = {}
+
+
+# Default system prompt of the memory manager. The capture instructions and optional tool lines are filled in per configuration.
+_SYSTEM_PROMPT_TEMPLATE = "\n".join(
+    (
+        "You are a MemoryManager that is responsible for manging key information about the user. "
+        "You will be provided with a criteria for memories to capture in the <memories_to_capture> section and a list of existing memories in the <existing_memories> section.",
+        "",
+        "## When to add or update memories",
+        "- Your first task is to decide if a memory needs to be added, updated, or deleted based on the user's message OR if no changes are needed.",
+        "- If the user's message meets the criteria in the <memories_to_capture> section and that information is not already captured in the <existing_memories> section, you should capture it as a memory.",
+        "- If the users messages does not meet the criteria in the <memories_to_capture> section, no memory updates are needed.",
+        "- If the existing memories in the <existing_memories> section capture all relevant information, no memory updates are needed.",
+        "",
+        "## How to add or update memories",
+        "- If you decide to add a new memory, create memories that captures key information, as if you were storing it for future reference.",
+        "- Memories should be a brief, third-person statements that encapsulate the most important aspect of the user's input, without adding any extraneous information.",
+        "  - Example: If the user's message is 'I'm going to the gym', a memory could be `John Doe goes to the gym regularly`.",
+        "  - Example: If the user's message is 'My name is John Doe', a memory could be `User's name is John Doe`.",
+        "- Don't make a single memory too long or complex, create multiple memories if needed to capture all the information.",
+        "- Don't repeat the same information in multiple memories. Rather update existing memories if needed.",
+        "- If a user asks for a memory to be updated or forgotten, remove all reference to the information that should be forgotten. Don't say 'The user used to like ...`",
+        "- When updating a memory, append the existing memory with new information rather than completely overwriting it.",
+        "- When a user's preferences change, update the relevant memories to reflect the new preferences but also capture what the user's preferences used to be and what has changed.",
+        "",
+        "## Criteria for creating memories",
+        "Use the following criteria to determine if a user's message should be captured as a memory.",
+        "",
+        "<memories_to_capture>",
+        "{memory_capture_instructions}",
+        "</memories_to_capture>",
+        "",
+        "## Updating memories",
+        "You will also be provided with a list of existing memories in the <existing_memories> section. You can:",
+        "  1. Decide to make no changes.",
+        "  2. Decide to add a new memory, using the `add_memory` tool.",
+        "  3. Decide to update an existing memory, using the `update_memory` tool.{delete_memory_line}{clear_memory_line}",
+        "You can call multiple tools in a single response if needed. ",
+        "Only add or update memories if it is necessary to capture key information provided by the user.",
+    )
+)
+_DEFAULT_MEMORY_CAPTURE_INSTRUCTIONS = dedent("""\
+    Memories should include details that could personalize ongoing interactions with the user, such as:
+      - Personal facts: name, age, occupation, location, interests, preferences, etc.
+      - Significant life events or experiences shared by the user
+      - Important context about the user's current situation, challenges or goals
+      - What the user likes or dislikes, their opinions, beliefs, values, etc.
+      - Any other details that provide valuable insights into the user's personality, perspective or needs\
+""")
+_DELETE_MEMORY_LINE = "\n  4. Decide to delete an existing memory, using the `delete_memory` tool."
+_CLEAR_MEMORY_LINE = "\n  5. Decide to clear all memories, using the `clear_memory` tool."
+
+# Maximum number of cached tool contexts per MemoryManager
+_TOOL_CONTEXT_CACHE_SIZE = 128
+
+
+class _MemoryToolContext:
+    """Holds the memory tool closures for a user and db, along with the state of the run using them."""
+
+    def __init__(self, user_id: str, db: MemoryDb):
+        self.user_id = user_id
+        self.db = db
+        # Input of the current run, read by the tools when storing memories
+        self.input_string: Optional[str] = None
+        # Timestamp shared by all memories stored during the current run
+        self.now: datetime = datetime.now()
+        # Existing memories of the current run, searched by the `search_memory` tool
+        self.existing_memories: List[Dict[str, Any]] = []
+        self.tools: Dict[str, Callable] = {}
+        # Functions built for the tools, by tool name, along with the tool they wrap.
+        # Reused across runs while the tool is the same callable, to skip re-wrapping its entrypoint
+        self.functions: Dict[str, Tuple[Callable, Function, Dict[str, Any]]] = {}
+        # Changes made by the tools during the run, written to the db once the model is done
+        self.pending_upserts: Dict[str, MemoryRow] = {}
+        self.pending_deletes: List[str] = []
+
+    def upsert_memory(self, memory: MemoryRow) -> None:
+        if memory.id in self.pending_deletes:
+            self.pending_deletes.remove(memory.id)
+        self.pending_upserts[memory.id] = memory  # type: ignore
+
+    def delete_memory(self, memory_id: str) -> None:
+        self.pending_upserts.pop(memory_id, None)
+        if memory_id not in self.pending_deletes:
+            self.pending_deletes.append(memory_id)
+
+    def clear_pending(self) -> None:
+        self.pending_upserts.clear()
+        self.pending_deletes.clear()
+
+
+def _build_memory_payload(
+    memory_id: str,
+    memory: str,
+    last_updated: datetime,
+    input_string: Optional[str],
+    topics: Optional[List[str]] = None,
+    resource_uri: Optional[List[str]] = None,
+    resource_type: Optional[List[str]] = None,
+    datetime_at: Optional[str] = None,
+    status: Optional[str] = None,
+    sensitive_mapping: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build the memory dict stored in a MemoryRow, matching the output of UserMemory.to_dict()."""
+    payload: Dict[str, Any] = {"memory_id": memory_id, "memory": memory}
+    if topics is not None:
+        payload["topics"] = topics
+    payload["last_updated"] = last_updated.isoformat()
+    if input_string is not None:
+        payload["input"] = input_string
+    if resource_uri is not None:
+        payload["resource_uri"] = resource_uri
+    if resource_type is not None:
+        payload["resource_type"] = resource_type
+    if datetime_at:
+        # Normalize the datetime provided by the model, raises a ValueError if it is not in ISO format
+        payload["datetime_at"] = datetime.fromisoformat(datetime_at).isoformat()
+    if status is not None:
+        payload["status"] = status
+    if sensitive_mapping is not None:
+        payload["sensitive_mapping"] = sensitive_mapping
+    return payload
+
 
-@dataclass
 class MemoryManager:
     """Model for Memory Manager"""
 
+    __slots__ = (
+        "model",
+        "system_message",
+        "memory_capture_instructions",
+        "additional_instructions",
+        "retrieval_mode",
+        "memories_updated",
+        "_tools_for_model",
+        "_functions_for_model",
+        "_static_prompt_prefix_cached",
+        "_tool_context_cache",
+        "_last_noop_key",
+    )
+
     # Model used for memory management
-    model: Optional[Model] = None
+    model: Optional[Model]
 
     # Provide the system message for the manager as a string. If not provided, a default prompt will be used.
-    system_message: Optional[str] = None
+    system_message: Optional[str]
 
     # Provide the memory capture instructions for the manager as a string. If not provided, a default prompt will be used.
-    memory_capture_instructions: Optional[str] = None
+    memory_capture_instructions: Optional[str]
 
     # Additional instructions for the manager
-    additional_instructions: Optional[str] = None
+    additional_instructions: Optional[str]
+
+    # How existing memories are provided to the model.
+    # "inline" adds all existing memories to the prompt.
+    # "tool" only adds the number of existing memories and lets the model look them up with the `search_memory` tool.
+    retrieval_mode: Literal["inline", "tool"]
 
     # Whether memories were created in the last run
-    memories_updated: bool = False
+    memories_updated: bool
 
     def __init__(
         self,
@@ -37,6 +182,7 @@ class MemoryManager:
         system_message: Optional[str] = None,
         memory_capture_instructions: Optional[str] = None,
         additional_instructions: Optional[str] = None,
+        retrieval_mode: Literal["inline", "tool"] = "inline",
     ):
         self.model = model
         if self.model is not None and isinstance(self.model, str):
@@ -44,100 +190,157 @@ class MemoryManager:
         self.system_message = system_message
         self.memory_capture_instructions = memory_capture_instructions
         self.additional_instructions = additional_instructions
+        self.retrieval_mode = retrieval_mode
+        self.memories_updated = False
         self._tools_for_model: Optional[List[Dict[str, Any]]] = None
         self._functions_for_model: Optional[Dict[str, Function]] = None
-
-    def determine_tools_for_model(self, tools: List[Callable]) -> None:
+        # Static system prompt prefix, keyed by the configuration it was built for
+        self._static_prompt_prefix_cached: Dict[Tuple[Optional[str], bool, bool], str] = {}
+        # Memory tool closures, keyed by (user_id, id(db)), reused across runs
+        self._tool_context_cache: Dict[Tuple[str, int], _MemoryToolContext] = {}
+        # Digest of the last create_or_update_memories call that made no memory updates
+        self._last_noop_key: Optional[bytes] = None
+
+    def determine_tools_for_model(
+        self, tools: List[Callable], tool_context: Optional[_MemoryToolContext] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Function]]:
         # Have to reset each time, because of different user IDs
-        self._tools_for_model = []
-        self._functions_for_model = {}
+        # The tools are also returned, so runs in other threads can't swap them out before they are used
+        tools_for_model: List[Dict[str, Any]] = []
+        functions_for_model: Dict[str, Function] = {}
 
         for tool in tools:
             try:
                 function_name = tool.__name__
-                if function_name not in self._functions_for_model:
-                    func = Function.from_callable(tool, strict=True)  # type: ignore
-                    func.strict = True
-                    self._functions_for_model[func.name] = func
-                    self._tools_for_model.append({"type": "function", "function": func.to_dict()})
+                if function_name not in functions_for_model:
+                    func, tool_dict = self._get_function_for_tool(tool, tool_context)
+                    functions_for_model[func.name] = func
+                    tools_for_model.append(tool_dict)
                     log_debug(f"Added function {func.name}")
             except Exception as e:
                 log_warning(f"Could not add function {tool}: {e}")
 
+        self._tools_for_model = tools_for_model
+        self._functions_for_model = functions_for_model
+        return tools_for_model, functions_for_model
+
+    @staticmethod
+    def _get_function_for_tool(
+        tool: Callable, tool_context: Optional[_MemoryToolContext] = None
+    ) -> Tuple[Function, Dict[str, Any]]:
+        """Return the Function and tool definition for a tool, reusing the parsed schema if available.
+        With a tool context, the Function built for the same tool in an earlier run is returned as-is."""
+        if tool_context is not None:
+            cached_function = tool_context.functions.get(tool.__name__)
+            if cached_function is not None and cached_function[0] is tool:
+                return cached_function[1], cached_function[2]
+
+        tool_code: Optional[CodeType] = getattr(tool, "__code__", None)
+        cached = _TOOL_SCHEMA_CACHE.get(tool_code) if tool_code is not None else None
+        if cached is not None:
+            cached_func, tool_dict = cached
+            # Only the entrypoint differs between closures, as it is bound to their user, db and tool context
+            func = cached_func.model_copy(update={"entrypoint": Function._wrap_callable(tool)})
+        else:
+            func = Function.from_callable(tool, strict=True)  # type: ignore
+            func.strict = True
+            tool_dict = {"type": "function", "function": func.to_dict()}
+            if tool_code is not None:
+                _TOOL_SCHEMA_CACHE[tool_code] = (func, tool_dict)
+
+        if tool_context is not None:
+            tool_context.functions[tool.__name__] = (tool, func, tool_dict)
+        return func, tool_dict
+
+    def _get_static_prompt_prefix(self, enable_delete_memory: bool = True, enable_clear_memory: bool = True) -> str:
+        """Return the part of the default system prompt that does not change between requests.
+        The prefix is built once per configuration and then served from a cache."""
+        cache_key = (self.memory_capture_instructions, enable_delete_memory, enable_clear_memory)
+        cached_prefix = self._static_prompt_prefix_cached.get(cache_key)
+        if cached_prefix is not None:
+            return cached_prefix
+
+        memory_capture_instructions = self.memory_capture_instructions or _DEFAULT_MEMORY_CAPTURE_INSTRUCTIONS
+        static_prompt_prefix = _SYSTEM_PROMPT_TEMPLATE.format(
+            memory_capture_instructions=memory_capture_instructions,
+            delete_memory_line=_DELETE_MEMORY_LINE if enable_delete_memory else "",
+            clear_memory_line=_CLEAR_MEMORY_LINE if enable_clear_memory else "",
+        )
+        self._static_prompt_prefix_cached[cache_key] = static_prompt_prefix
+        return static_prompt_prefix
+
     def get_system_message(
         self,
         existing_memories: Optional[List[Dict[str, Any]]] = None,
         enable_delete_memory: bool = True,
         enable_clear_memory: bool = True,
-    ) -> Message:
+    ) -> List[Message]:
+        """Return the system messages for the memory manager.
+
+        The first message only holds the static prompt, so it stays identical across requests and can be
+        served from the model provider's prompt cache. The existing memories and additional instructions
+        are sent in a second system message. With retrieval_mode="tool", only the number of existing memories
+        is sent and the model looks them up with the `search_memory` tool.
+        """
         if self.system_message is not None:
-            return Message(role="system", content=self.system_message)
-
-        memory_capture_instructions = self.memory_capture_instructions or dedent("""\
-            Memories should include details that could personalize ongoing interactions with the user, such as:
-              - Personal facts: name, age, occupation, location, interests, preferences, etc.
-              - Significant life events or experiences shared by the user
-              - Important context about the user's current situation, challenges or goals
-              - What the user likes or dislikes, their opinions, beliefs, values, etc.
-              - Any other details that provide valuable insights into the user's personality, perspective or needs\
-        """)
-
-        # -*- Return a system message for the memory manager
-        system_prompt_lines = [
-            "You are a MemoryManager that is responsible for manging key information about the user. "
-            "You will be provided with a criteria for memories to capture in the <memories_to_capture> section and a list of existing memories in the <existing_memories> section.",
-            "",
-            "## When to add or update memories",
-            "- Your first task is to decide if a memory needs to be added, updated, or deleted based on the user's message OR if no changes are needed.",
-            "- If the user's message meets the criteria in the <memories_to_capture> section and that information is not already captured in the <existing_memories> section, you should capture it as a memory.",
-            "- If the users messages does not meet the criteria in the <memories_to_capture> section, no memory updates are needed.",
-            "- If the existing memories in the <existing_memories> section capture all relevant information, no memory updates are needed.",
-            "",
-            "## How to add or update memories",
-            "- If you decide to add a new memory, create memories that captures key information, as if you were storing it for future reference.",
-            "- Memories should be a brief, third-person statements that encapsulate the most important aspect of the user's input, without adding any extraneous information.",
-            "  - Example: If the user's message is 'I'm going to the gym', a memory could be `John Doe goes to the gym regularly`.",
-            "  - Example: If the user's message is 'My name is John Doe', a memory could be `User's name is John Doe`.",
-            "- Don't make a single memory too long or complex, create multiple memories if needed to capture all the information.",
-            "- Don't repeat the same information in multiple memories. Rather update existing memories if needed.",
-            "- If a user asks for a memory to be updated or forgotten, remove all reference to the information that should be forgotten. Don't say 'The user used to like ...`",
-            "- When updating a memory, append the existing memory with new information rather than completely overwriting it.",
-            "- When a user's preferences change, update the relevant memories to reflect the new preferences but also capture what the user's preferences used to be and what has changed.",
-            "",
-            "## Criteria for creating memories",
-            "Use the following criteria to determine if a user's message should be captured as a memory.",
-            "",
-            "<memories_to_capture>",
-            memory_capture_instructions,
-            "</memories_to_capture>",
-            "",
-            "## Updating memories",
-            "You will also be provided with a list of existing memories in the <existing_memories> section. You can:",
-            "  1. Decide to make no changes.",
-            "  2. Decide to add a new memory, using the `add_memory` tool.",
-            "  3. Decide to update an existing memory, using the `update_memory` tool.",
-        ]
-        if enable_delete_memory:
-            system_prompt_lines.append("  4. Decide to delete an existing memory, using the `delete_memory` tool.")
-        if enable_clear_memory:
-            system_prompt_lines.append("  5. Decide to clear all memories, using the `clear_memory` tool.")
-        system_prompt_lines += [
-            "You can call multiple tools in a single response if needed. ",
-            "Only add or update memories if it is necessary to capture key information provided by the user.",
+            return [Message(role="system", content=self.system_message)]
+
+        # -*- Return the system messages for the memory manager
+        system_messages: List[Message] = [
+            Message(
+                role="system",
+                content=self._get_static_prompt_prefix(
+                    enable_delete_memory=enable_delete_memory, enable_clear_memory=enable_clear_memory
+                ),
+            )
         ]
 
-        if existing_memories and len(existing_memories) > 0:
-            system_prompt_lines.append("\n<existing_memories>")
-            for existing_memory in existing_memories:
-                system_prompt_lines.append(f"ID: {existing_memory['memory_id']}")
-                system_prompt_lines.append(f"Memory: {existing_memory['memory']}")
-                system_prompt_lines.append("")
-            system_prompt_lines.append("</existing_memories>")
+        context_lines: List[str] = []
+        if existing_memories and len(existing_memories) > 0 and self.retrieval_mode == "tool":
+            context_lines.append(
+                "<existing_memories>\n"
+                f"There are {len(existing_memories)} existing memories. "
+                "Use the `search_memory` tool to look up the memories relevant to the user's message.\n"
+                "</existing_memories>"
+            )
+        elif existing_memories and len(existing_memories) > 0:
+            context_lines.append(
+                "<existing_memories>\n"
+                + json.dumps(
+                    [
+                        {"memory_id": existing_memory["memory_id"], "memory": existing_memory["memory"]}
+                        for existing_memory in existing_memories
+                    ],
+                    ensure_ascii=False,
+                )
+                + "\n</existing_memories>"
+            )
 
         if self.additional_instructions:
-            system_prompt_lines.append(self.additional_instructions)
+            context_lines.append(self.additional_instructions)
 
-        return Message(role="system", content="\n".join(system_prompt_lines))
+        if len(context_lines) > 0:
+            system_messages.append(Message(role="system", content="\n".join(context_lines)))
+
+        return system_messages
+
+    @staticmethod
+    def _get_noop_key(
+        user_id: str,
+        db: MemoryDb,
+        input_string: str,
+        existing_memories: List[Dict[str, Any]],
+        delete_memories: bool,
+        clear_memories: bool,
+    ) -> bytes:
+        """Return a digest of everything that determines the outcome of a create_or_update_memories call."""
+        from hashlib import blake2b
+
+        digest = blake2b(digest_size=16)
+        digest.update(f"{user_id}\x00{id(db)}\x00{delete_memories}\x00{clear_memories}\x00{input_string}".encode())
+        for existing_memory in existing_memories or []:
+            digest.update(f"\x00{existing_memory.get('memory_id')}\x00{existing_memory.get('memory')}".encode())
+        return digest.digest()
 
     def create_or_update_memories(
         self,
@@ -157,19 +360,31 @@ class MemoryManager:
         if len(messages) == 1:
             input_string = messages[0].get_content_string()
         else:
-            input_string = f"{', '.join([m.get_content_string() for m in messages if m.role == 'user' and m.content])}"
+            input_string = ", ".join(m.get_content_string() for m in messages if m.role == "user" and m.content)
 
-        model_copy = deepcopy(self.model)
+        # Skip the model call if there is no input, or if the same input already produced no updates
+        noop_key = self._get_noop_key(user_id, db, input_string, existing_memories, delete_memories, clear_memories)
+        if not input_string or noop_key == self._last_noop_key:
+            log_debug("No new input for MemoryManager, skipping")
+            log_debug("MemoryManager End", center=True)
+            return "No memory updates"
+
+        model_copy = self.model.clone_shallow()
+        tool_context = self._acquire_tool_context(user_id, db, input_string, existing_memories)
         # Update the Model (set defaults, add logit etc.)
-        self.determine_tools_for_model(
+        tools_for_model, functions_for_model = self.determine_tools_for_model(
             self._get_db_tools(
-                user_id, db, input_string, enable_delete_memory=delete_memories, enable_clear_memory=clear_memories
+                tool_context,
+                enable_delete_memory=delete_memories,
+                enable_clear_memory=clear_memories,
+                enable_search_memory=self.retrieval_mode == "tool",
             ),
+            tool_context=tool_context,
         )
 
         # Prepare the List of messages to send to the Model
         messages_for_model: List[Message] = [
-            self.get_system_message(
+            *self.get_system_message(
                 existing_memories=existing_memories,
                 enable_delete_memory=delete_memories,
                 enable_clear_memory=clear_memories,
@@ -178,14 +393,26 @@ class MemoryManager:
         ]
 
         # Generate a response from the Model (includes running function calls)
-        response = model_copy.response(
-            messages=messages_for_model, tools=self._tools_for_model, functions=self._functions_for_model
-        )
-
-        if response.tool_calls is not None and len(response.tool_calls) > 0:
+        try:
+            response = model_copy.response(
+                messages=messages_for_model, tools=tools_for_model, functions=functions_for_model
+            )
+        finally:
+            db_errors = self._release_tool_context(tool_context)
+            # Keep the provider clients created by the copy, so later runs reuse their connections
+            self.model.share_clients_from(model_copy)
+
+        # Model.response() records the tools it ran in tool_executions, not tool_calls
+        if response.tool_executions is not None and len(response.tool_executions) > 0:
             self.memories_updated = True
+            self._last_noop_key = None
+        else:
+            self._last_noop_key = noop_key
         log_debug("MemoryManager End", center=True)
 
+        if db_errors:
+            # The tools reported success before the changes were written, so report the db errors instead
+            return "\n".join(db_errors)
         return response.content or "No response from model"
 
     async def acreate_or_update_memories(
@@ -206,19 +433,32 @@ class MemoryManager:
         if len(messages) == 1:
             input_string = messages[0].get_content_string()
         else:
-            input_string = f"{', '.join([m.get_content_string() for m in messages if m.role == 'user' and m.content])}"
+            input_string = ", ".join(m.get_content_string() for m in messages if m.role == "user" and m.content)
+
+        # Skip the model call if there is no input, or if the same input already produced no updates
+        noop_key = self._get_noop_key(user_id, db, input_string, existing_memories, delete_memories, clear_memories)
+        if not input_string or noop_key == self._last_noop_key:
+            log_debug("No new input for MemoryManager, skipping")
+            log_debug("MemoryManager End", center=True)
+            return "No memory updates"
 
-        model_copy = deepcopy(self.model)
+        model_copy = self.model.clone_shallow()
+        tool_context = self._acquire_tool_context(user_id, db, input_string, existing_memories)
         # Update the Model (set defaults, add logit etc.)
-        self.determine_tools_for_model(
+        tools_for_model, functions_for_model = self.determine_tools_for_model(
             self._get_db_tools(
-                user_id, db, input_string, enable_delete_memory=delete_memories, enable_clear_memory=clear_memories
-            ) + self._get_reminder_tools(user_id),
+                tool_context,
+                enable_delete_memory=delete_memories,
+                enable_clear_memory=clear_memories,
+                enable_search_memory=self.retrieval_mode == "tool",
+            )
+            + self._get_reminder_tools(user_id),
+            tool_context=tool_context,
         )
 
         # Prepare the List of messages to send to the Model
         messages_for_model: List[Message] = [
-            self.get_system_message(
+            *self.get_system_message(
                 existing_memories=existing_memories,
                 enable_delete_memory=delete_memories,
                 enable_clear_memory=clear_memories,
@@ -227,16 +467,98 @@ class MemoryManager:
         ]
 
         # Generate a response from the Model (includes running function calls)
-        response = await model_copy.aresponse(
-            messages=messages_for_model, tools=self._tools_for_model, functions=self._functions_for_model
-        )
-
-        if response.tool_calls is not None and len(response.tool_calls) > 0:
+        try:
+            response = await model_copy.aresponse(
+                messages=messages_for_model, tools=tools_for_model, functions=functions_for_model
+            )
+        finally:
+            db_errors = self._release_tool_context(tool_context)
+
+        # Model.response() records the tools it ran in tool_executions, not tool_calls
+        if response.tool_executions is not None and len(response.tool_executions) > 0:
             self.memories_updated = True
+            self._last_noop_key = None
+        else:
+            self._last_noop_key = noop_key
         log_debug("MemoryManager End", center=True)
 
+        if db_errors:
+            # The tools reported success before the changes were written, so report the db errors instead
+            return "\n".join(db_errors)
         return response.content or "No response from model"
 
+    async def ato_thread_create_or_update_memories(
+        self,
+        messages: List[Message],
+        existing_memories: List[Dict[str, Any]],
+        user_id: str,
+        db: MemoryDb,
+        delete_memories: bool = True,
+        clear_memories: bool = True,
+    ) -> str:
+        """Run the sync create_or_update_memories in a worker thread, without blocking the event loop.
+        Use this for Model backends that don't implement an async response."""
+        import asyncio
+        from functools import partial
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None,
+            partial(
+                self.create_or_update_memories,
+                messages=messages,
+                existing_memories=existing_memories,
+                user_id=user_id,
+                db=db,
+                delete_memories=delete_memories,
+                clear_memories=clear_memories,
+            ),
+        )
+
+    async def abatch_create_or_update_memories(
+        self,
+        jobs: List[Tuple[List[Message], List[Dict[str, Any]], str, MemoryDb]],
+        delete_memories: bool = True,
+        clear_memories: bool = True,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Union[str, BaseException]]:
+        """Run acreate_or_update_memories for several independent jobs concurrently.
+
+        Args:
+            jobs: A list of (messages, existing_memories, user_id, db) tuples.
+            delete_memories: Whether the model may delete memories.
+            clear_memories: Whether the model may clear all memories.
+            max_concurrency: Maximum number of model requests in flight at once.
+                Defaults to the AGNO_MEMORY_MAX_CONCURRENCY environment variable, or 4.
+
+        Returns:
+            The response for each job, in order. Exceptions are returned instead of raised.
+        """
+        import asyncio
+
+        if max_concurrency is None:
+            env_max_concurrency = getenv("AGNO_MEMORY_MAX_CONCURRENCY", "4")
+            try:
+                max_concurrency = int(env_max_concurrency)
+            except ValueError:
+                log_warning(f"Invalid AGNO_MEMORY_MAX_CONCURRENCY: {env_max_concurrency!r}, using 4")
+                max_concurrency = 4
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def _run_job(job: Tuple[List[Message], List[Dict[str, Any]], str, MemoryDb]) -> str:
+            messages, existing_memories, user_id, db = job
+            async with semaphore:
+                # Each job builds its own model copy and tools before the first await, so jobs don't share state
+                return await self.acreate_or_update_memories(
+                    messages=messages,
+                    existing_memories=existing_memories,
+                    user_id=user_id,
+                    db=db,
+                    delete_memories=delete_memories,
+                    clear_memories=clear_memories,
+                )
+
+        return await asyncio.gather(*[_run_job(job) for job in jobs], return_exceptions=True)
+
     def run_memory_task(
         self,
         task: str,
@@ -252,17 +574,22 @@ class MemoryManager:
 
         log_debug("MemoryManager Start", center=True)
 
-        model_copy = deepcopy(self.model)
+        model_copy = self.model.clone_shallow()
+        tool_context = self._acquire_tool_context(user_id, db, task, existing_memories)
         # Update the Model (set defaults, add logit etc.)
-        self.determine_tools_for_model(
+        tools_for_model, functions_for_model = self.determine_tools_for_model(
             self._get_db_tools(
-                user_id, db, task, enable_delete_memory=delete_memories, enable_clear_memory=clear_memories
+                tool_context,
+                enable_delete_memory=delete_memories,
+                enable_clear_memory=clear_memories,
+                enable_search_memory=self.retrieval_mode == "tool",
             ),
+            tool_context=tool_context,
         )
 
         # Prepare the List of messages to send to the Model
         messages_for_model: List[Message] = [
-            self.get_system_message(
+            *self.get_system_message(
                 existing_memories, enable_delete_memory=delete_memories, enable_clear_memory=clear_memories
             ),
             # For models that require a non-system message
@@ -270,14 +597,22 @@ class MemoryManager:
         ]
 
         # Generate a response from the Model (includes running function calls)
-        response = model_copy.response(
-            messages=messages_for_model, tools=self._tools_for_model, functions=self._functions_for_model
-        )
+        try:
+            response = model_copy.response(
+                messages=messages_for_model, tools=tools_for_model, functions=functions_for_model
+            )
+        finally:
+            db_errors = self._release_tool_context(tool_context)
+            # Keep the provider clients created by the copy, so later runs reuse their connections
+            self.model.share_clients_from(model_copy)
 
         if response.tool_calls is not None and len(response.tool_calls) > 0:
             self.memories_updated = True
         log_debug("MemoryManager End", center=True)
 
+        if db_errors:
+            # The tools reported success before the changes were written, so report the db errors instead
+            return "\n".join(db_errors)
         return response.content or "No response from model"
 
     async def arun_memory_task(
@@ -295,17 +630,22 @@ class MemoryManager:
 
         log_debug("MemoryManager Start", center=True)
 
-        model_copy = deepcopy(self.model)
+        model_copy = self.model.clone_shallow()
+        tool_context = self._acquire_tool_context(user_id, db, task, existing_memories)
         # Update the Model (set defaults, add logit etc.)
-        self.determine_tools_for_model(
+        tools_for_model, functions_for_model = self.determine_tools_for_model(
             self._get_db_tools(
-                user_id, db, task, enable_delete_memory=delete_memories, enable_clear_memory=clear_memories
+                tool_context,
+                enable_delete_memory=delete_memories,
+                enable_clear_memory=clear_memories,
+                enable_search_memory=self.retrieval_mode == "tool",
             ),
+            tool_context=tool_context,
         )
 
         # Prepare the List of messages to send to the Model
         messages_for_model: List[Message] = [
-            self.get_system_message(
+            *self.get_system_message(
                 existing_memories, enable_delete_memory=delete_memories, enable_clear_memory=clear_memories
             ),
             # For models that require a non-system message
@@ -313,29 +653,110 @@ class MemoryManager:
         ]
 
         # Generate a response from the Model (includes running function calls)
-        response = await model_copy.aresponse(
-            messages=messages_for_model, tools=self._tools_for_model, functions=self._functions_for_model
-        )
+        try:
+            response = await model_copy.aresponse(
+                messages=messages_for_model, tools=tools_for_model, functions=functions_for_model
+            )
+        finally:
+            db_errors = self._release_tool_context(tool_context)
 
         if response.tool_calls is not None and len(response.tool_calls) > 0:
             self.memories_updated = True
         log_debug("MemoryManager End", center=True)
 
+        if db_errors:
+            # The tools reported success before the changes were written, so report the db errors instead
+            return "\n".join(db_errors)
         return response.content or "No response from model"
 
     # -*- DB Functions
-    def _get_db_tools(
+    def _acquire_tool_context(
         self,
         user_id: str,
         db: MemoryDb,
         input_string: str,
+        existing_memories: Optional[List[Dict[str, Any]]] = None,
+        now: Optional[datetime] = None,
+    ) -> _MemoryToolContext:
+        """Return the tool context for a run, reusing the cached tool closures for this user and db if available."""
+        # The context is taken out of the cache while the run is in progress, so a concurrent run
+        # for the same user and db builds its own closures instead of overwriting this run's input
+        tool_context = self._tool_context_cache.pop((user_id, id(db)), None)
+        if tool_context is None:
+            tool_context = _MemoryToolContext(user_id=user_id, db=db)
+            tool_context.tools = self._build_db_tools(tool_context)
+        tool_context.input_string = input_string
+        tool_context.existing_memories = existing_memories or []
+        tool_context.now = now or datetime.now()
+        return tool_context
+
+    def _flush_tool_context(self, tool_context: _MemoryToolContext) -> List[str]:
+        """Write the changes buffered by the memory tools to the db.
+
+        Returns:
+            The errors raised by the db, if any.
+        """
+        errors: List[str] = []
+        if tool_context.pending_upserts:
+            try:
+                tool_context.db.upsert_memories(list(tool_context.pending_upserts.values()))
+                log_debug(f"Memories stored: {len(tool_context.pending_upserts)}")
+            except Exception as e:
+                log_warning(f"Error storing memories in db: {e}")
+                errors.append(f"Error storing memories in db: {e}")
+        if tool_context.pending_deletes:
+            try:
+                tool_context.db.delete_memories(list(tool_context.pending_deletes))
+                log_debug(f"Memories deleted: {len(tool_context.pending_deletes)}")
+            except Exception as e:
+                log_warning(f"Error deleting memories in db: {e}")
+                errors.append(f"Error deleting memories in db: {e}")
+        tool_context.clear_pending()
+        return errors
+
+    def _release_tool_context(self, tool_context: _MemoryToolContext) -> List[str]:
+        """Write the buffered changes to the db and put the tool context back in the cache once the run is done.
+
+        Returns:
+            The errors raised by the db while writing the changes, if any.
+        """
+        errors = self._flush_tool_context(tool_context)
+        # Don't keep the user's input and memories alive in the cache between runs
+        tool_context.input_string = None
+        tool_context.existing_memories = []
+        if len(self._tool_context_cache) >= _TOOL_CONTEXT_CACHE_SIZE:
+            # Evict the oldest entry
+            self._tool_context_cache.pop(next(iter(self._tool_context_cache)), None)
+        self._tool_context_cache[(tool_context.user_id, id(tool_context.db))] = tool_context
+        return errors
+
+    def _get_db_tools(
+        self,
+        tool_context: _MemoryToolContext,
         enable_add_memory: bool = True,
         enable_update_memory: bool = True,
         enable_delete_memory: bool = True,
         enable_clear_memory: bool = True,
+        enable_search_memory: bool = False,
     ) -> List[Callable]:
-        from datetime import datetime
+        functions: List[Callable] = []
+        if enable_add_memory:
+            functions.append(tool_context.tools["add_memory"])
+        if enable_update_memory:
+            functions.append(tool_context.tools["update_memory"])
+        if enable_delete_memory:
+            functions.append(tool_context.tools["delete_memory"])
+        if enable_clear_memory:
+            functions.append(tool_context.tools["clear_memory"])
+        if enable_search_memory:
+            functions.append(tool_context.tools["search_memory"])
+        return functions
+
+    def _build_db_tools(self, tool_context: _MemoryToolContext) -> Dict[str, Callable]:
+        user_id = tool_context.user_id
+        db = tool_context.db
 
+        # The tools buffer upserts and deletes on the tool context, they are written in one go when the run is done
         def add_memory(memory: str, topics: List[str] = None, resource_uri: Optional[List[str]] = None, resource_type: Optional[List[str]] = None, datetime_at: Optional[str] = None, status: Optional[str] = None, sensitive_mapping: Optional[str] = None) -> str:
             """Use this function to add a memory to the database.
             Args:
@@ -352,24 +773,24 @@ class MemoryManager:
             from uuid import uuid4
 
             try:
-                last_updated = datetime.now()
-                memory_id = str(uuid4())
-                db.upsert_memory(
+                last_updated = tool_context.now
+                memory_id = uuid4().hex
+                tool_context.upsert_memory(
                     MemoryRow(
                         id=memory_id,
                         user_id=user_id,
-                        memory=UserMemory(
+                        memory=_build_memory_payload(
                             memory_id=memory_id,
                             memory=memory,
-                            topics=topics,
                             last_updated=last_updated,
-                            input=input_string,
+                            input_string=tool_context.input_string,
+                            topics=topics,
                             resource_uri=resource_uri,
                             resource_type=resource_type,
                             datetime_at=datetime_at,
                             status=status,
                             sensitive_mapping=sensitive_mapping,
-                        ).to_dict(),
+                        ),
                         last_updated=last_updated,
                     )
                 )
@@ -394,23 +815,23 @@ class MemoryManager:
                 str: A message indicating if the memory was updated successfully or not.
             """
             try:
-                last_updated = datetime.now()
-                db.upsert_memory(
+                last_updated = tool_context.now
+                tool_context.upsert_memory(
                     MemoryRow(
                         id=memory_id,
                         user_id=user_id,
-                        memory=UserMemory(
+                        memory=_build_memory_payload(
                             memory_id=memory_id,
                             memory=memory,
-                            topics=topics,
                             last_updated=last_updated,
-                            input=input_string,
+                            input_string=tool_context.input_string,
+                            topics=topics,
                             resource_uri=resource_uri,
                             resource_type=resource_type,
                             datetime_at=datetime_at,
                             status=status,
                             sensitive_mapping=sensitive_mapping,
-                        ).to_dict(),
+                        ),
                         last_updated=last_updated,
                     )
                 )
@@ -428,7 +849,7 @@ class MemoryManager:
                 str: A message indicating if the memory was deleted successfully or not.
             """
             try:
-                db.delete_memory(memory_id=memory_id)
+                tool_context.delete_memory(memory_id=memory_id)
                 log_debug("Memory deleted")
                 return "Memory deleted successfully"
             except Exception as e:
@@ -441,20 +862,43 @@ class MemoryManager:
             Returns:
                 str: A message indicating if the memory was cleared successfully or not.
             """
+            # Changes made earlier in this run are cleared as well
+            tool_context.clear_pending()
             db.clear()
             log_debug("Memory cleared")
             return "Memory cleared successfully"
 
-        functions: List[Callable] = []
-        if enable_add_memory:
-            functions.append(add_memory)
-        if enable_update_memory:
-            functions.append(update_memory)
-        if enable_delete_memory:
-            functions.append(delete_memory)
-        if enable_clear_memory:
-            functions.append(clear_memory)
-        return functions
+        def search_memory(query: str, limit: int = 5) -> str:
+            """Use this function to search the existing memories of the user.
+            Args:
+                query (str): The words to look for in the existing memories.
+                limit (int): The maximum number of memories to return.
+            Returns:
+                str: The matching memories as a JSON list of objects with `memory_id` and `memory`.
+            """
+            terms = query.lower().split()
+            matches: List[Tuple[int, Dict[str, Any]]] = []
+            for existing_memory in tool_context.existing_memories:
+                memory_text = str(existing_memory.get("memory", "")).lower()
+                score = sum(1 for term in terms if term in memory_text)
+                if score > 0:
+                    matches.append((score, existing_memory))
+            matches.sort(key=lambda match: match[0], reverse=True)
+            log_debug(f"Memories found: {len(matches)}")
+            return json.dumps(
+                [
+                    {"memory_id": existing_memory.get("memory_id"), "memory": existing_memory.get("memory")}
+                    for _, existing_memory in matches[:limit]
+                ]
+            )
+
+        return {
+            "add_memory": add_memory,
+            "update_memory": update_memory,
+            "delete_memory": delete_memory,
+            "clear_memory": clear_memory,
+            "search_memory": search_memory,
+        }
 
     def create_or_update_reminder(self, user_id: str, reminder: str, datetime_at: str) -> str:
         """Use this function to create or update a reminder in the database.
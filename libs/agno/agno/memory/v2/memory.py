@@ -200,17 +200,17 @@ class Memory:
         self.refresh_from_db(user_id=user_id)
 
     def to_dict(self) -> Dict[str, Any]:
-        _memory_dict = {}
+        _memory_dict: Dict[str, Any] = {}
         # Add summary if it exists
         if self.summaries is not None:
             _memory_dict["summaries"] = {
-                user_id: {session_id: summary.to_dict() for session_id, summary in session_summaries.items()}
+                user_id: dict(zip(session_summaries, SessionSummary.to_dict_many(session_summaries.values())))
                 for user_id, session_summaries in self.summaries.items()
             }
         # Add memories if they exist
         if self.memories is not None:
             _memory_dict["memories"] = {
-                user_id: {memory_id: memory.to_dict() for memory_id, memory in user_memories.items()}
+                user_id: dict(zip(user_memories, UserMemory.to_dict_many(user_memories.values())))
                 for user_id, user_memories in self.memories.items()
             }
         # Add runs if they exist
@@ -287,7 +287,7 @@ class Memory:
         """
         from uuid import uuid4
 
-        memory_id = memory.memory_id or str(uuid4())
+        memory_id = memory.memory_id or uuid4().hex
         if memory.memory_id is None:
             memory.memory_id = memory_id
         if user_id is None:
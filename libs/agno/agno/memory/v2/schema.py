@@ -1,10 +1,148 @@
-from dataclasses import dataclass
+import json
+import sys
+from dataclasses import MISSING, dataclass, fields
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, TypedDict, TypeVar, Union
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 
-@dataclass
-class UserMemory:
+# Use __slots__ for the memory dataclasses where supported (Python 3.10+)
+_DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+_datetime_fromiso = datetime.fromisoformat
+
+
+class UserMemoryDict(TypedDict, total=False):
+    """Shape of UserMemory.to_dict(), keys whose value is None are left out"""
+
+    memory_id: str
+    memory: str
+    topics: List[str]
+    last_updated: str
+    input: str
+    resource_uri: List[str]
+    resource_type: List[str]
+    datetime_at: str
+    status: str
+    sensitive_mapping: str
+
+
+class SessionSummaryDict(TypedDict, total=False):
+    """Shape of SessionSummary.to_dict(), keys whose value is None are left out"""
+
+    summary: str
+    topics: List[str]
+    last_updated: str
+
+
+_DictT = TypeVar("_DictT")
+_T = TypeVar("_T")
+
+
+def _compile_function(source: str, name: str, qualname: str, doc: str) -> Any:
+    """Compile a generated function and give it the metadata of a method of the owning class."""
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<generated {qualname}>", "exec"), {}, namespace)
+    function = namespace[name]
+    function.__module__ = __name__
+    function.__qualname__ = qualname
+    function.__doc__ = doc
+    return function
+
+
+def _make_to_dict(
+    owner: str, field_specs: Tuple[Tuple[str, str], ...], dict_type: Type[_DictT]
+) -> Callable[[Any], _DictT]:
+    """Generate a to_dict() for the given (field, kind) pairs, kind being "plain" or "datetime".
+
+    Like the __init__ generated by dataclasses, the function is built from source so each field is read and
+    checked with straight-line code. Fields that are None are left out and keys are added in the given order.
+    """
+    lines = ["def to_dict(self):", "    _dict = {}"]
+    for name, kind in field_specs:
+        if kind == "datetime":
+            # The ISO string is cached along with the datetime it was computed from,
+            # so it is still valid as long as the field holds that same datetime
+            lines += [
+                f"    v = self.{name}",
+                "    if v is not None:",
+                "        try:",
+                f"            cached = self._{name}_iso_src is v",
+                "        except AttributeError:",
+                "            # Copies and unpickled objects skip __post_init__",
+                "            cached = False",
+                "        if cached:",
+                f"            _dict[{name!r}] = self._{name}_iso",
+                "        else:",
+                f"            _dict[{name!r}] = self._{name}_iso = v.isoformat()",
+                f"            self._{name}_iso_src = v",
+            ]
+        else:
+            lines += [f"    v = self.{name}", "    if v is not None:", f"        _dict[{name!r}] = v"]
+    lines.append("    return _dict")
+
+    to_dict = _compile_function(
+        "\n".join(lines), "to_dict", f"{owner}.to_dict", "Return the fields that are not None as a dict."
+    )
+    to_dict.__annotations__ = {"return": dict_type}
+    return to_dict
+
+
+# Generated from_dict functions, per class so subclasses also pass their own fields
+_FROM_DICT_CACHE: Dict[type, Callable[[Any, Dict[str, Any]], Any]] = {}
+
+
+def _get_from_dict(cls: Type[_T]) -> Callable[[Type[_T], Dict[str, Any]], _T]:
+    """Return a from_dict() passing the init fields of the dataclass explicitly, other keys in the data are ignored.
+
+    The function is generated on first use for each class. Fields without a default are required, fields that
+    default to None are read with data.get() and fields with another default are only passed when present.
+    """
+    from_dict = _FROM_DICT_CACHE.get(cls)
+    if from_dict is None:
+        kwargs: List[str] = []
+        present: List[str] = []
+        for f in fields(cls):  # type: ignore[arg-type]
+            if not f.init:
+                continue
+            if f.default is MISSING and f.default_factory is MISSING:
+                kwargs.append(f"{f.name}=data[{f.name!r}]")
+            elif f.default is None:
+                kwargs.append(f"{f.name}=get({f.name!r})")
+            else:
+                present.append(f.name)
+        lines = ["def from_dict(cls, data):", "    get = data.get"]
+        if present:
+            lines.append("    kwargs = {}")
+            lines += [f"    if {name!r} in data:\n        kwargs[{name!r}] = data[{name!r}]" for name in present]
+            kwargs.append("**kwargs")
+        lines.append(f"    return cls({', '.join(kwargs)})")
+        from_dict = _compile_function(
+            "\n".join(lines), "from_dict", f"{cls.__qualname__}.from_dict", f"Create a {cls.__name__} from a dict."
+        )
+        _FROM_DICT_CACHE[cls] = from_dict
+    return from_dict
+
+
+class _UserMemoryIsoCache:
+    """Slots for the ISO strings cached by UserMemory.to_dict() and the datetimes they were computed from.
+    They are declared here so they are not dataclass fields."""
+
+    __slots__ = ("_last_updated_iso", "_last_updated_iso_src", "_datetime_at_iso", "_datetime_at_iso_src")
+
+
+class _SessionSummaryIsoCache:
+    """Slots for the ISO string cached by SessionSummary.to_dict() and the datetime it was computed from.
+    They are declared here so they are not dataclass fields."""
+
+    __slots__ = ("_last_updated_iso", "_last_updated_iso_src")
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class UserMemory(_UserMemoryIsoCache):
     """Model for User Memories"""
 
     memory: str
@@ -21,57 +159,83 @@ class UserMemory:
     datetime_at: Optional[datetime] = None
     status: Optional[str] = None
 
-    sensitive_mapping: str = None
-
-    def to_dict(self) -> Dict[str, Any]:
-        if self.last_updated and isinstance(self.last_updated, str):
-            self.last_updated = datetime.fromisoformat(self.last_updated)
-        if self.datetime_at and isinstance(self.datetime_at, str):
-            self.datetime_at = datetime.fromisoformat(self.datetime_at)
-        _dict = {
-            "memory_id": self.memory_id,
-            "memory": self.memory,
-            "topics": self.topics,
-            "last_updated": self.last_updated.isoformat() if self.last_updated else None,
-            "input": self.input,
-            "resource_uri": self.resource_uri,
-            "resource_type": self.resource_type,
-            "datetime_at": self.datetime_at.isoformat() if self.datetime_at else None,
-            "status": self.status,
-            "sensitive_mapping": self.sensitive_mapping,
-        }
-        return {k: v for k, v in _dict.items() if v is not None}
+    sensitive_mapping: Optional[str] = None
+
+    def __post_init__(self):
+        self._last_updated_iso_src = self._datetime_at_iso_src = None
+        # Datetimes may be provided as ISO strings, parse them once here
+        last_updated = self.last_updated
+        if isinstance(last_updated, str):
+            self.last_updated = _datetime_fromiso(last_updated) if last_updated else None
+        datetime_at = self.datetime_at
+        if isinstance(datetime_at, str):
+            self.datetime_at = _datetime_fromiso(datetime_at) if datetime_at else None
+
+    to_dict = _make_to_dict(
+        "UserMemory",
+        (
+            ("memory_id", "plain"),
+            ("memory", "plain"),
+            ("topics", "plain"),
+            ("last_updated", "datetime"),
+            ("input", "plain"),
+            ("resource_uri", "plain"),
+            ("resource_type", "plain"),
+            ("datetime_at", "datetime"),
+            ("status", "plain"),
+            ("sensitive_mapping", "plain"),
+        ),
+        UserMemoryDict,
+    )
+
+    @staticmethod
+    def to_dict_many(memories: Iterable["UserMemory"]) -> List[UserMemoryDict]:
+        """Serialize several memories, looking up to_dict only once."""
+        to_dict = UserMemory.to_dict
+        return [to_dict(memory) for memory in memories]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "UserMemory":
-        last_updated = data.get("last_updated")
-        datetime_at = data.get("datetime_at")
-        if last_updated:
-            data["last_updated"] = datetime.fromisoformat(last_updated)
-        if datetime_at:
-            data["datetime_at"] = datetime.fromisoformat(datetime_at)
-        return cls(**data)
+        # ISO datetime strings are parsed in __post_init__
+        return _get_from_dict(cls)(cls, data)
 
 
-@dataclass
-class SessionSummary:
+@dataclass(**_DATACLASS_SLOTS)
+class SessionSummary(_SessionSummaryIsoCache):
     """Model for Session Summary."""
 
     summary: str
     topics: Optional[List[str]] = None
     last_updated: Optional[datetime] = None
 
-    def to_dict(self) -> Dict[str, Any]:
-        _dict = {
-            "summary": self.summary,
-            "topics": self.topics,
-            "last_updated": self.last_updated.isoformat() if self.last_updated else None,
-        }
-        return {k: v for k, v in _dict.items() if v is not None}
+    def __post_init__(self):
+        self._last_updated_iso_src = None
+        # The datetime may be provided as an ISO string, parse it once here
+        last_updated = self.last_updated
+        if isinstance(last_updated, str):
+            self.last_updated = _datetime_fromiso(last_updated) if last_updated else None
+
+    to_dict = _make_to_dict(
+        "SessionSummary", (("summary", "plain"), ("topics", "plain"), ("last_updated", "datetime")), SessionSummaryDict
+    )
+
+    @staticmethod
+    def to_dict_many(summaries: Iterable["SessionSummary"]) -> List[SessionSummaryDict]:
+        """Serialize several session summaries, looking up to_dict only once."""
+        to_dict = SessionSummary.to_dict
+        return [to_dict(summary) for summary in summaries]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SessionSummary":
-        last_updated = data.get("last_updated")
-        if last_updated:
-            data["last_updated"] = datetime.fromisoformat(last_updated)
-        return cls(**data)
+        # The ISO datetime string is parsed in __post_init__
+        return _get_from_dict(cls)(cls, data)
+
+
+def dumps(obj: Union[UserMemory, SessionSummary]) -> str:
+    """Serialize a memory or session summary to JSON, using orjson when it is installed.
+
+    The output matches json.dumps(obj.to_dict()) with compact separators and without ASCII escaping.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj.to_dict()).decode()
+    return json.dumps(obj.to_dict(), ensure_ascii=False, separators=(",", ":"))
@@ -160,10 +160,13 @@ class AwsBedrock(Model):
             Tuple[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]: The formatted messages.
         """
         formatted_messages: List[Dict[str, Any]] = []
-        system_message = None
+        # Each system message is sent as its own system content block
+        system_message: Optional[List[Dict[str, Any]]] = None
         for message in messages:
             if message.role == "system":
-                system_message = [{"text": message.content}]
+                if system_message is None:
+                    system_message = []
+                system_message.append({"text": message.content})
             else:
                 formatted_message: Dict[str, Any] = {"role": message.role, "content": []}
                 # Handle tool results
@@ -1574,6 +1574,41 @@ class Model(ABC):
     def get_instructions_for_model(self, tools: Optional[List[Any]] = None) -> Optional[List[str]]:
         return self.instructions
 
+    def clone_shallow(self) -> "Model":
+        """Create a shallow copy of the Model instance.
+
+        Cheaper than a deepcopy for callers that only need their own copy of the per-run tool state.
+        All other attributes are shared with the original instance by reference, including provider
+        clients and their HTTP connection pools. Clients that are created lazily by the copy can be
+        handed back to the original with `share_clients_from`.
+
+        Returns:
+            Model: A new Model instance with the tool state reset.
+        """
+        from copy import copy
+
+        new_model = copy(self)
+        # Reset the attributes that are skipped when deep copying
+        for k in ("_tools", "_functions"):
+            if k in new_model.__dict__:
+                setattr(new_model, k, None)
+        if isinstance(self._tool_choice, dict):
+            new_model._tool_choice = dict(self._tool_choice)
+        return new_model
+
+    def share_clients_from(self, model: "Model") -> None:
+        """Adopt the sync provider client created by a shallow clone, if this instance has none yet.
+
+        Only call this after a sync run of the clone. Clients created during an async run may be bound to that
+        run's event loop (some providers, e.g. Gemini and Mistral, make async requests through `client`),
+        and callers may run each request in a new event loop (e.g. repeated asyncio.run).
+
+        Args:
+            model (Model): A clone of this instance, created with `clone_shallow`.
+        """
+        if getattr(self, "client", None) is None and getattr(model, "client", None) is not None:
+            self.client = model.client  # type: ignore
+
     def __deepcopy__(self, memo):
         """Create a deep copy of the Model instance.
 
@@ -358,11 +358,13 @@ class Gemini(Model):
         """
         formatted_messages: List = []
         file_content: Optional[Union[GeminiFile, Part]] = None
-        system_message = None
+        # Multiple system messages are joined into a single system instruction
+        system_messages: List[str] = []
         for message in messages:
             role = message.role
             if role in ["system", "developer"]:
-                system_message = message.content
+                if message.content is not None:
+                    system_messages.append(message.content)  # type: ignore
                 continue
 
             # Set the role for the message according to Gemini's requirements
@@ -462,6 +464,7 @@ class Gemini(Model):
             if isinstance(file_content, GeminiFile):
                 formatted_messages.insert(0, file_content)
 
+        system_message = "\n".join(system_messages) if system_messages else None
         return formatted_messages, system_message
 
     def _format_audio_for_message(self, audio: Audio) -> Optional[Union[Part, GeminiFile]]:
@@ -1,5 +1,10 @@
+import asyncio
+import copy
+import json
+from dataclasses import asdict, dataclass, fields
 from datetime import datetime
-from unittest.mock import MagicMock, Mock, patch
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -97,6 +102,69 @@ def test_set_model():
     assert memory.summary_manager.model == model
 
 
+def test_model_clone_shallow():
+    model = OpenAIChat()
+    model._tool_choice = {"type": "function", "function": {"name": "add_memory"}}
+    model_copy = model.clone_shallow()
+    assert model_copy is not model
+    assert model_copy.id == model.id
+    assert model_copy._tool_choice == model._tool_choice
+    assert model_copy._tool_choice is not model._tool_choice
+
+    # Clients created lazily by the copy are shared back with the original
+    model_copy.client = Mock()
+    model_copy.async_client = Mock()
+    model.share_clients_from(model_copy)
+    assert model.client is model_copy.client
+    assert getattr(model, "async_client", None) is None
+
+
+def test_memory_manager_async_client_per_event_loop(mock_db):
+    async def aresponse(self, **kwargs):
+        # Like providers that cache their async client, bound to the event loop it was created in
+        if getattr(self, "async_client", None) is None:
+            self.async_client = Mock(loop=asyncio.get_running_loop())
+        assert self.async_client.loop is asyncio.get_running_loop()
+        return Mock(content="No memory updates", tool_executions=None)
+
+    model = OpenAIChat()
+    memory_manager = MemoryManager(model=model)
+    with patch.object(OpenAIChat, "aresponse", aresponse):
+        for content in ("I like pizza", "I like pasta"):
+            asyncio.run(
+                memory_manager.acreate_or_update_memories(
+                    messages=[Message(role="user", content=content)], existing_memories=[], user_id="user_1", db=mock_db
+                )
+            )
+
+    assert getattr(model, "async_client", None) is None
+
+
+def test_memory_manager_async_run_does_not_share_sync_client(mock_db):
+    pytest.importorskip("google.genai")
+    from agno.models.google import Gemini
+
+    clients = []
+
+    async def aresponse(self, **kwargs):
+        # Gemini makes async requests with get_client().aio, so the sync client is created during the async run
+        clients.append(self.get_client())
+        return Mock(content="No memory updates", tool_executions=None)
+
+    model = Gemini(id="gemini-2.0-flash", api_key="test")
+    memory_manager = MemoryManager(model=model)
+    with patch.object(Gemini, "aresponse", aresponse):
+        for content in ("I like pizza", "I like pasta"):
+            asyncio.run(
+                memory_manager.acreate_or_update_memories(
+                    messages=[Message(role="user", content=content)], existing_memories=[], user_id="user_1", db=mock_db
+                )
+            )
+
+    assert model.client is None
+    assert clients[0] is not clients[1]
+
+
 def test_custom_memory_manager_with_system_message(mock_model, mock_db):
     # Create a custom system prompt
     custom_system_message = "You are a specialized memory manager that focuses on capturing user preferences."
@@ -108,12 +176,13 @@ def test_custom_memory_manager_with_system_message(mock_model, mock_db):
     memory = Memory(model=mock_model, db=mock_db, memory_manager=memory_manager)
 
     # Test that the get_system_message method returns the custom prompt
-    system_message = memory.memory_manager.get_system_message()
-    assert system_message.role == "system"
-    assert system_message.content == custom_system_message
+    system_messages = memory.memory_manager.get_system_message()
+    assert len(system_messages) == 1
+    assert system_messages[0].role == "system"
+    assert system_messages[0].content == custom_system_message
 
     # Test that the custom prompt is used when creating memories
-    with patch.object(memory.memory_manager, "create_or_update_memories") as mock_create:
+    with patch.object(MemoryManager, "create_or_update_memories") as mock_create:
         mock_create.return_value = "Memories created with custom message"
 
         # Call the method that would use the system prompt
@@ -137,9 +206,264 @@ def test_custom_memory_manager_with_additional_instructions(mock_model, mock_db)
     memory = Memory(model=mock_model, db=mock_db, memory_manager=memory_manager)
 
     # Test that the get_system_message method returns the custom prompt
-    system_message = memory.memory_manager.get_system_message()
-    assert system_message.role == "system"
-    assert custom_additional_instructions in system_message.content
+    system_messages = memory.memory_manager.get_system_message()
+    assert all(system_message.role == "system" for system_message in system_messages)
+    assert custom_additional_instructions not in system_messages[0].content
+    assert custom_additional_instructions in system_messages[-1].content
+
+
+def test_memory_manager_system_message_reuses_static_prefix(mock_model):
+    memory_manager = MemoryManager(model=mock_model)
+    existing_memories = [{"memory_id": "1", "memory": "The user likes pizza"}]
+
+    first = memory_manager.get_system_message(existing_memories=existing_memories)
+    second = memory_manager.get_system_message()
+
+    assert len(memory_manager._static_prompt_prefix_cached) == 1
+    assert len(first) == 2
+    assert len(second) == 1
+    assert first[0].content == second[0].content
+    assert '{"memory_id": "1", "memory": "The user likes pizza"}' in first[1].content
+
+
+def test_memory_manager_system_messages_survive_provider_formatting():
+    pytest.importorskip("google.genai")
+    pytest.importorskip("boto3")
+    from agno.models.aws import AwsBedrock
+    from agno.models.google import Gemini
+
+    memory_manager = MemoryManager(additional_instructions="Keep memories short.")
+    messages = memory_manager.get_system_message(
+        existing_memories=[{"memory_id": "1", "memory": "The user likes pizza"}]
+    ) + [Message(role="user", content="I like pasta")]
+    static_prompt = messages[0].content
+
+    # Gemini and Bedrock take the system prompt out of the messages, all system messages must be kept
+    _, gemini_system_message = Gemini(id="gemini-2.0-flash")._format_messages(messages)
+    assert static_prompt in gemini_system_message
+    assert "The user likes pizza" in gemini_system_message
+    assert "Keep memories short." in gemini_system_message
+
+    _, bedrock_system_message = AwsBedrock(id="amazon.nova-lite-v1:0")._format_messages(messages)
+    assert bedrock_system_message == [{"text": messages[0].content}, {"text": messages[1].content}]
+
+
+@pytest.mark.asyncio
+async def test_memory_manager_batch_create_or_update_memories(mock_model, mock_db):
+    mock_model.clone_shallow.return_value = mock_model
+    mock_model.aresponse = AsyncMock(
+        side_effect=[Mock(content="Memories updated", tool_executions=None), RuntimeError("Rate limited")]
+    )
+    memory_manager = MemoryManager(model=mock_model)
+
+    results = await memory_manager.abatch_create_or_update_memories(
+        jobs=[
+            ([Message(role="user", content="I like pizza")], [], "user_1", mock_db),
+            ([Message(role="user", content="I like pasta")], [], "user_2", mock_db),
+        ],
+        max_concurrency=2,
+    )
+
+    assert mock_model.aresponse.await_count == 2
+    assert results[0] == "Memories updated"
+    assert isinstance(results[1], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_memory_manager_batch_invalid_max_concurrency_env(mock_model, mock_db, monkeypatch):
+    monkeypatch.setenv("AGNO_MEMORY_MAX_CONCURRENCY", "four")
+    mock_model.clone_shallow.return_value = mock_model
+    mock_model.aresponse = AsyncMock(return_value=Mock(content="Memories updated", tool_executions=None))
+    memory_manager = MemoryManager(model=mock_model)
+
+    results = await memory_manager.abatch_create_or_update_memories(
+        jobs=[([Message(role="user", content="I like pizza")], [], "user_1", mock_db)]
+    )
+
+    assert results == ["Memories updated"]
+
+
+def test_memory_manager_reuses_parsed_tool_schemas(mock_db):
+    memory_manager = MemoryManager()
+
+    tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like pizza")
+    memory_manager.determine_tools_for_model(memory_manager._get_db_tools(tool_context))
+    first_tools = memory_manager._tools_for_model
+    tool_context = memory_manager._acquire_tool_context("user_2", mock_db, "I like pasta")
+    memory_manager.determine_tools_for_model(memory_manager._get_db_tools(tool_context))
+
+    assert memory_manager._tools_for_model == first_tools
+    memory_manager._functions_for_model["add_memory"].entrypoint(memory="The user likes pasta")
+    memory_manager._release_tool_context(tool_context)
+    memory_row = mock_db.upsert_memories.call_args[0][0][0]
+    assert memory_row.user_id == "user_2"
+    assert memory_row.memory["input"] == "I like pasta"
+
+
+def test_memory_manager_reuses_tool_closures(mock_db):
+    memory_manager = MemoryManager()
+
+    tool_context = memory_manager._acquire_tool_context(
+        "user_1", mock_db, "I like pizza", existing_memories=[{"memory_id": "1", "memory": "The user likes pizza"}]
+    )
+    # A concurrent run for the same user and db gets its own closures
+    concurrent_tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like pasta")
+    assert concurrent_tool_context is not tool_context
+    memory_manager._release_tool_context(tool_context)
+    # The cached context doesn't keep the run's input and memories
+    assert tool_context.input_string is None
+    assert tool_context.existing_memories == []
+
+    reused_tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like sushi")
+    assert reused_tool_context is tool_context
+    reused_tool_context.tools["add_memory"](memory="The user likes sushi")
+    assert reused_tool_context.pending_upserts
+    assert all(row.memory["input"] == "I like sushi" for row in reused_tool_context.pending_upserts.values())
+    assert concurrent_tool_context.input_string == "I like pasta"
+
+
+def test_memory_manager_reuses_tool_functions(mock_db):
+    from agno.tools.function import Function
+
+    memory_manager = MemoryManager()
+    tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like pizza")
+    _, first_functions = memory_manager.determine_tools_for_model(
+        memory_manager._get_db_tools(tool_context), tool_context=tool_context
+    )
+    memory_manager._release_tool_context(tool_context)
+
+    tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like pasta")
+    with patch.object(Function, "_wrap_callable") as mock_wrap_callable:
+        _, second_functions = memory_manager.determine_tools_for_model(
+            memory_manager._get_db_tools(tool_context), tool_context=tool_context
+        )
+
+    mock_wrap_callable.assert_not_called()
+    assert all(second_functions[name] is first_functions[name] for name in first_functions)
+    second_functions["add_memory"].entrypoint(memory="The user likes pasta")
+    assert all(row.memory["input"] == "I like pasta" for row in tool_context.pending_upserts.values())
+
+
+def test_memory_manager_writes_tool_changes_after_run(mock_db):
+    memory_manager = MemoryManager()
+    tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like pizza")
+    tools = tool_context.tools
+
+    tools["update_memory"](memory_id="1", memory="The user likes pizza")
+    tools["update_memory"](memory_id="2", memory="The user likes pasta")
+    tools["delete_memory"](memory_id="2")
+    tools["delete_memory"](memory_id="3")
+    tools["update_memory"](memory_id="3", memory="The user likes sushi")
+    mock_db.upsert_memory.assert_not_called()
+    mock_db.delete_memory.assert_not_called()
+
+    memory_manager._release_tool_context(tool_context)
+
+    upserted_rows = mock_db.upsert_memories.call_args[0][0]
+    assert [row.id for row in upserted_rows] == ["1", "3"]
+    assert upserted_rows[0].last_updated == upserted_rows[1].last_updated == tool_context.now
+    mock_db.delete_memories.assert_called_once_with(["2"])
+    assert not tool_context.pending_upserts
+    assert not tool_context.pending_deletes
+
+
+def test_memory_manager_reports_db_errors(mock_model, mock_db):
+    from agno.memory.v2.db.base import MemoryDb
+    from agno.models.response import ModelResponse, ToolExecution
+
+    def response(messages, tools, functions):
+        functions["update_memory"].entrypoint(memory_id="1", memory="The user likes pizza")
+        functions["update_memory"].entrypoint(memory_id="2", memory="The user likes pasta")
+        functions["delete_memory"].entrypoint(memory_id="3")
+        return ModelResponse(content="Memories updated", tool_executions=[ToolExecution(tool_name="update_memory")])
+
+    mock_model.clone_shallow.return_value = mock_model
+    mock_model.response.side_effect = response
+    # The default bulk upsert, on a db whose first row fails
+    mock_db.upsert_memory.side_effect = [RuntimeError("database is locked"), None]
+    mock_db.upsert_memories.side_effect = lambda memories: MemoryDb.upsert_memories(mock_db, memories)
+    memory_manager = MemoryManager(model=mock_model)
+
+    result = memory_manager.create_or_update_memories(
+        [Message(role="user", content="I like pizza and pasta")], [], "user_1", mock_db
+    )
+
+    assert result == "Error storing memories in db: Failed to upsert 1 of 2 memories (1: database is locked)"
+    assert mock_db.upsert_memory.call_count == 2
+    mock_db.delete_memories.assert_called_once_with(["3"])
+
+
+def test_memory_manager_tool_retrieval_mode(mock_db):
+    memory_manager = MemoryManager(retrieval_mode="tool")
+    existing_memories = [
+        {"memory_id": "1", "memory": "The user likes pizza"},
+        {"memory_id": "2", "memory": "The user lives in Paris"},
+    ]
+
+    system_messages = memory_manager.get_system_message(existing_memories=existing_memories)
+    assert "There are 2 existing memories" in system_messages[1].content
+    assert "The user likes pizza" not in system_messages[1].content
+
+    tool_context = memory_manager._acquire_tool_context("user_1", mock_db, "I like pizza", existing_memories)
+    tools = memory_manager._get_db_tools(tool_context, enable_search_memory=True)
+    assert tools[-1].__name__ == "search_memory"
+    assert json.loads(tools[-1](query="Pizza")) == [{"memory_id": "1", "memory": "The user likes pizza"}]
+
+
+@pytest.mark.asyncio
+async def test_memory_manager_to_thread_create_or_update_memories(mock_model, mock_db):
+    memory_manager = MemoryManager(model=mock_model)
+    messages = [Message(role="user", content="I like pizza")]
+
+    with patch.object(MemoryManager, "create_or_update_memories", return_value="Memories updated") as mock_create:
+        result = await memory_manager.ato_thread_create_or_update_memories(
+            messages=messages, existing_memories=[], user_id="user_1", db=mock_db
+        )
+
+    assert result == "Memories updated"
+    mock_create.assert_called_once_with(
+        messages=messages,
+        existing_memories=[],
+        user_id="user_1",
+        db=mock_db,
+        delete_memories=True,
+        clear_memories=True,
+    )
+
+
+def test_memory_manager_skips_empty_and_repeated_input(mock_model, mock_db):
+    mock_model.clone_shallow.return_value = mock_model
+    mock_model.response.return_value = Mock(content="No changes needed", tool_executions=None)
+    memory_manager = MemoryManager(model=mock_model)
+    messages = [Message(role="user", content="Hello")]
+
+    assert memory_manager.create_or_update_memories(messages, [], "user_1", mock_db) == "No changes needed"
+    assert memory_manager.create_or_update_memories(messages, [], "user_1", mock_db) == "No memory updates"
+    assert memory_manager.create_or_update_memories(messages, [], "user_2", mock_db) == "No changes needed"
+    assert (
+        memory_manager.create_or_update_memories([Message(role="user", content="")], [], "user_1", mock_db)
+        == "No memory updates"
+    )
+    assert mock_model.response.call_count == 2
+
+
+def test_memory_manager_tool_run_resets_skip(mock_model, mock_db):
+    from agno.models.response import ModelResponse, ToolExecution
+
+    def response(messages, tools, functions):
+        functions["add_memory"].entrypoint(memory="The user likes pizza")
+        return ModelResponse(content="Memory added", tool_executions=[ToolExecution(tool_name="add_memory")])
+
+    mock_model.clone_shallow.return_value = mock_model
+    mock_model.response.side_effect = response
+    memory_manager = MemoryManager(model=mock_model)
+    messages = [Message(role="user", content="I like pizza")]
+
+    assert memory_manager.create_or_update_memories(messages, [], "user_1", mock_db) == "Memory added"
+    assert memory_manager.create_or_update_memories(messages, [], "user_1", mock_db) == "Memory added"
+    assert memory_manager.memories_updated
+    assert mock_model.response.call_count == 2
+    assert mock_db.upsert_memories.call_count == 2
 
 
 def test_custom_summarizer_with_system_message(mock_model, mock_db):
@@ -748,6 +1072,86 @@ def test_to_dict_and_from_dict(memory_with_model, sample_user_memory, sample_ses
     assert new_memory.summaries[user_id][session_id].summary == sample_session_summary.summary
 
 
+def test_user_memory_parses_iso_datetimes():
+    data = {
+        "memory": "The user likes pizza",
+        "last_updated": "2025-01-01T10:00:00",
+        "datetime_at": "2025-01-02T09:30:00",
+    }
+
+    user_memory = UserMemory.from_dict(data)
+
+    assert user_memory.last_updated == datetime(2025, 1, 1, 10, 0, 0)
+    assert user_memory.datetime_at == datetime(2025, 1, 2, 9, 30, 0)
+    assert data["last_updated"] == "2025-01-01T10:00:00"
+    assert user_memory.to_dict()["datetime_at"] == "2025-01-02T09:30:00"
+
+    session_summary = SessionSummary(summary="A session about pizza", last_updated="2025-01-01T10:00:00")
+    assert session_summary.last_updated == datetime(2025, 1, 1, 10, 0, 0)
+
+
+def test_user_memory_refreshes_cached_iso_datetimes():
+    user_memory = UserMemory(memory="The user likes pizza", last_updated=datetime(2025, 1, 1, 10, 0, 0))
+    assert user_memory.to_dict()["last_updated"] == "2025-01-01T10:00:00"
+
+    user_memory.last_updated = datetime(2025, 2, 1, 10, 0, 0)
+    assert user_memory.to_dict()["last_updated"] == "2025-02-01T10:00:00"
+
+    user_memory.last_updated = None
+    assert "last_updated" not in user_memory.to_dict()
+
+    # The cache is not part of the dataclass
+    assert asdict(user_memory) == asdict(UserMemory(memory="The user likes pizza"))
+    assert [f.name for f in fields(SessionSummary)] == ["summary", "topics", "last_updated"]
+    assert copy.copy(user_memory).to_dict() == user_memory.to_dict()
+
+
+def test_user_memory_from_dict_ignores_unknown_keys():
+    data = {"memory": "The user likes pizza", "memory_id": "1", "legacy_field": "value"}
+
+    user_memory = UserMemory.from_dict(data)
+
+    assert user_memory == UserMemory(memory="The user likes pizza", memory_id="1")
+    assert UserMemory.from_dict(user_memory.to_dict()) == user_memory
+    assert data == {"memory": "The user likes pizza", "memory_id": "1", "legacy_field": "value"}
+    assert UserMemory.from_dict.__qualname__ == "UserMemory.from_dict"
+    assert UserMemory.to_dict.__module__ == UserMemory.__module__
+
+    @dataclass
+    class UserMemoryWithMedia(UserMemory):
+        media_url: Optional[str] = None
+        media_count: int = 1
+
+    media_memory = UserMemoryWithMedia.from_dict({"memory": "The user likes pizza", "media_url": "pizza.png"})
+    assert media_memory == UserMemoryWithMedia(memory="The user likes pizza", media_url="pizza.png")
+    assert UserMemoryWithMedia.from_dict({"memory": "The user likes pizza", "media_count": 2}).media_count == 2
+
+
+def test_dumps_memory_schema():
+    from agno.memory.v2 import schema
+
+    user_memory = UserMemory(memory="L'utilisateur aime la pizza", topics=["food"], last_updated=datetime(2025, 1, 1))
+    expected = json.dumps(user_memory.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    assert schema.dumps(user_memory) == expected
+    with patch.object(schema, "orjson", None):
+        assert schema.dumps(user_memory) == expected
+
+
+def test_to_dict_many():
+    user_memories = [
+        UserMemory(memory="The user likes pizza"),
+        UserMemory(memory="The user lives in Paris", topics=["location"]),
+    ]
+    assert UserMemory.to_dict_many(user_memories) == [user_memory.to_dict() for user_memory in user_memories]
+
+    session_summaries = (
+        SessionSummary(summary="A session about pizza"),
+        SessionSummary(summary="A session about Paris"),
+    )
+    assert SessionSummary.to_dict_many(session_summaries) == [summary.to_dict() for summary in session_summaries]
+
+
 def test_clear(memory_with_model, sample_user_memory):
     # Add data to memory
     memory_with_model.add_user_memory(sample_user_memory, user_id="test_user")